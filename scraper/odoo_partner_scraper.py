@@ -8,7 +8,8 @@ Kullanım:
     python odoo_partner_scraper.py
 
 Gereksinimler:
-    pip install requests beautifulsoup4 pandas
+    Python 3.10+
+    pip install requests requests-cache selectolax orjson brotli pandas
 
 Çıktı:
     - odoo_partners.csv: Tüm partner bilgilerini içeren CSV dosyası
@@ -16,17 +17,38 @@ Gereksinimler:
 """
 
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 import json
+import logging
+import orjson
 import csv
+import os
 import time
 import re
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
-from datetime import datetime
+import sys
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Her kart/sayfa için yeniden derlenmemesi için modül seviyesinde derlenen desenler
+AVG_USERS_RE = re.compile(r'(\d+)\s*kullanıcı', re.IGNORECASE)
+BIG_USERS_RE = re.compile(r'~?(\d+)\s*kullanıcı', re.IGNORECASE)
+REF_RE = re.compile(r'(\d+)\s*Referans')
+EXP_RE = re.compile(r'(\d+)\s*Sertifikalı')
+PAGE_RE_BYTES = re.compile(rb'/page/(\d+)')  # Ham HTML üzerinde pagination linkleri
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+@dataclass(slots=True)
 class Partner:
     """Partner veri modeli"""
     name: str
@@ -53,48 +75,183 @@ class OdooPartnerScraper:
     
     BASE_URL = "https://www.odoo.com"
     PARTNERS_URL = "https://www.odoo.com/tr_TR/partners/country/turkiye-215"
+    MAX_CONCURRENT_REQUESTS = 8  # Liste sayfaları için aynı anda açık istek sınırı
+    CARD_SELECTOR = 'a.text-decoration-none.row.p-2'  # Liste sayfasındaki partner kartları
+    NEGATIVE_CACHE_TTL = 24 * 3600  # Boş/404 sayfa kayıtlarının geçerlilik süresi (saniye)
+    MAX_RATE_LIMIT_RETRIES = 3  # HTTP 429 sonrası aynı URL için en fazla tekrar deneme
     
-    def __init__(self, delay_seconds: float = 1.0):
+    def __init__(self, max_requests: int = 4, window_seconds: float = 2.0,
+                 cache_name: str = "odoo_cache", negative_cache_file: str = "negative_cache.json"):
         """
         Args:
-            delay_seconds: Her istek arasında beklenecek süre (saniye)
+            max_requests: Her zaman penceresinde gönderilebilecek en fazla istek sayısı
+            window_seconds: Rate limit zaman penceresi (saniye)
+            cache_name: HTTP cache'inin tutulacağı SQLite dosyasının adı (.sqlite eklenir)
+            negative_cache_file: 404 dönen / partner içermeyen sayfaların saklandığı JSON dosyası
         """
-        self.delay_seconds = delay_seconds
-        self.session = requests.Session()
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        # Son penceredeki isteklerin zamanları; thread'ler arasında paylaşılır
+        self._bucket: deque = deque()
+        self._bucket_lock = threading.Lock()
+        self._blocked_until = 0.0  # 429 Retry-After süresi dolana kadar istek gönderilmez
+        self.negative_cache_file = negative_cache_file
+        # URL -> kaydedildiği zaman; bu URL'ler tekrar istenmez
+        self._negative_cache: Dict[str, float] = self._load_negative_cache()
+        # Yanıtlar diskte saklanır; süresi dolan sayfalar ETag / Last-Modified ile
+        # doğrulanır ve değişmemişse (304) gövde yeniden indirilmez
+        self.session = requests_cache.CachedSession(
+            cache_name,
+            backend='sqlite',
+            cache_control=True,
+            expire_after=3600,
+        )
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
+            'Connection': 'keep-alive',
         })
+        # Tek host'a giden eşzamanlı istekler için bağlantı havuzu; TCP/TLS bağlantıları yeniden kullanılır
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16, max_retries=3)
+        self.session.mount('https://', adapter)
+    
+    def _load_negative_cache(self) -> Dict[str, float]:
+        """Önceki çalıştırmalardan kalan, süresi dolmamış boş sayfa kayıtlarını yükler"""
+        try:
+            with open(self.negative_cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        now = time.time()
+        return {url: ts for url, ts in entries.items() if now - ts < self.NEGATIVE_CACHE_TTL}
+    
+    def _save_negative_cache(self):
+        """Boş sayfa kayıtlarını bir sonraki çalıştırma için diske yazar"""
+        try:
+            with open(self.negative_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self._negative_cache, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning("⚠️ %s yazılamadı - %s", self.negative_cache_file, e)
+    
+    def _wait_for_slot(self):
+        """Pencere içinde max_requests dolmuşsa en eski isteğin süresi dolana kadar bekler"""
+        while True:
+            # Bekleme süresi kilit altında hesaplanır, uyku kilit dışında yapılır; böylece
+            # bekleyen thread'ler varken 429 işleyicisi _blocked_until'ı güncelleyebilir
+            with self._bucket_lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                else:
+                    while self._bucket and now - self._bucket[0] >= self.window_seconds:
+                        self._bucket.popleft()
+                    if len(self._bucket) < self.max_requests:
+                        self._bucket.append(now)
+                        return
+                    wait = self.window_seconds - (now - self._bucket[0])
+            time.sleep(wait)
     
-    def _get_page(self, url: str) -> Optional[BeautifulSoup]:
-        """URL'den sayfa içeriğini çeker"""
+    def _retry_after_seconds(self, response: requests.Response) -> float:
+        """Retry-After header'ını (saniye veya HTTP tarihi) saniyeye çevirir"""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return float(retry_after)
         try:
-            print(f"📥 Sayfa çekiliyor: {url}")
-            response = self.session.get(url, timeout=30)
+            retry_at = parsedate_to_datetime(retry_after)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return self.window_seconds
+    
+    def _get_raw(self, url: str) -> Optional[bytes]:
+        """URL'den ham sayfa içeriğini (bytes) çeker"""
+        if url in self._negative_cache:
+            logger.info("⏭️ Boş olduğu bilinen sayfa atlanıyor: %s", url)
+            return None
+        
+        try:
+            logger.debug("📥 Sayfa çekiliyor: %s", url)
+            # Süresi dolmamış cache kaydı varsa ağa çıkmadan döndür; bu istekler rate limit'e sayılmaz.
+            # Kayıt yoksa veya süresi dolmuşsa (504) yeniden doğrulama dahil gerçek istek atılır.
+            response = self.session.get(url, timeout=30, only_if_cached=True)
+            if response.status_code != 504:
+                return response.content
+            
+            for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                self._wait_for_slot()
+                response = self.session.get(url, timeout=30)
+                if response.status_code != 429 or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                    break
+                
+                # Sunucunun istediği süre boyunca tüm thread'ler beklesin
+                retry_after = self._retry_after_seconds(response)
+                logger.warning("⏳ Rate limit aşıldı, %.0f sn bekleniyor: %s", retry_after, url)
+                with self._bucket_lock:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            
+            if response.status_code == 404:
+                self._negative_cache[url] = time.time()
             response.raise_for_status()
-            response.encoding = 'utf-8'
-            return BeautifulSoup(response.text, 'html.parser')
+            return response.content
         except requests.RequestException as e:
-            print(f"❌ Hata: {url} çekilemedi - {e}")
+            logger.error("❌ Hata: %s çekilemedi - %s", url, e)
             return None
     
+    def _get_page(self, url: str) -> Optional[LexborHTMLParser]:
+        """URL'den sayfa içeriğini çeker ve parse eder"""
+        content = self._get_raw(url)
+        if content is None:
+            return None
+        return LexborHTMLParser(content)
+    
     def _extract_text(self, element, default: str = "") -> str:
         """Element'ten text çıkarır"""
         if element:
-            return element.get_text(strip=True)
+            return element.text(strip=True)
         return default
     
+    def _next_sibling(self, node: LexborNode, tag: Optional[str] = None,
+                      class_: Optional[str] = None) -> Optional[LexborNode]:
+        """Text node'ları atlayarak koşula uyan ilk sonraki kardeş element'i bulur"""
+        sibling = node.next
+        while sibling is not None:
+            if self._matches(sibling, tag, class_):
+                return sibling
+            sibling = sibling.next
+        return None
+    
+    def _previous_siblings(self, node: LexborNode, tag: str, limit: int) -> List[LexborNode]:
+        """Verilen tag'e sahip önceki kardeş elementleri yakından uzağa doğru döndürür"""
+        siblings = []
+        sibling = node.prev
+        while sibling is not None and len(siblings) < limit:
+            if self._matches(sibling, tag):
+                siblings.append(sibling)
+            sibling = sibling.prev
+        return siblings
+    
+    def _matches(self, node: LexborNode, tag: Optional[str] = None,
+                 class_: Optional[str] = None) -> bool:
+        """Node'un element olup tag/class koşuluna uyup uymadığını kontrol eder"""
+        if node.tag.startswith('-'):  # -text, -comment
+            return False
+        if tag and node.tag != tag:
+            return False
+        if class_ and class_ not in (node.attributes.get('class') or '').split():
+            return False
+        return True
+    
     def _parse_partner_card(self, card) -> Optional[Partner]:
         """Partner kartından bilgileri çıkarır"""
         try:
             # Partner profil URL'i
-            profile_url = card.get('href', '')
+            profile_url = card.attributes.get('href') or ''
             if profile_url and not profile_url.startswith('http'):
                 profile_url = self.BASE_URL + profile_url
             
             # Partner adı - h5 içindeki ilk span
-            name_element = card.select_one('h5 span:first-child')
+            name_element = card.css_first('h5 span:first-child')
             name = self._extract_text(name_element, "Bilinmiyor")
             
             # Odoo's HTML has corrupted encoding for some partners in its database
@@ -102,29 +259,29 @@ class OdooPartnerScraper:
                 name = "Kıta Yazılım"
             
             # Partner seviyesi (Gold, Silver, Ready)
-            level_element = card.select_one('h5 span.badge')
+            level_element = card.css_first('h5 span.badge')
             level = self._extract_text(level_element, "").strip()
             if not level or level.lower() == 'learning':
                 level = "Learning"
             
             # Logo URL
-            logo_element = card.select_one('img')
+            logo_element = card.css_first('img')
             logo_url = None
             if logo_element:
-                logo_url = logo_element.get('src', '')
+                logo_url = logo_element.attributes.get('src') or ''
                 if logo_url and not logo_url.startswith('http'):
                     logo_url = self.BASE_URL + logo_url
             
             # Rating yüzdesi
-            rating_element = card.select_one('span.text-warning')
+            rating_element = card.css_first('span.text-warning')
             rating_percentage = None
             if rating_element:
-                rating_text = self._extract_text(rating_element.find_next_sibling())
+                rating_text = self._extract_text(self._next_sibling(rating_element))
                 if rating_text:
                     rating_percentage = rating_text
             
             # Lokasyon bilgileri - small tag içindeki spanlar
-            location_spans = card.select('small span')
+            location_spans = card.css('small span')
             city = ""
             district = ""
             country = "Türkiye"
@@ -153,42 +310,39 @@ class OdooPartnerScraper:
                     if len(location_texts) > 1 and not location_texts[1].isdigit():
                         district = location_texts[1]
             
-            # Proje büyüklükleri
-            all_small = card.select('small')
+            # Proje büyüklükleri, referans ve sertifikalı uzman sayıları - kart ağacında tek geçiş
             average_project_size = None
             large_project_size = None
+            references_count = None
+            certified_experts_count = None
             
-            for small in all_small:
-                text = self._extract_text(small)
-                if 'Ortalama Proje' in text or 'ortalama' in text.lower():
-                    # Kullanıcı sayısını çıkar
-                    match = re.search(r'(\d+)\s*kullanıcı', text, re.IGNORECASE)
-                    if match:
-                        average_project_size = f"{match.group(1)} kullanıcı"
-                elif 'Büyük Proje' in text or 'büyük' in text.lower():
-                    match = re.search(r'~?(\d+)\s*kullanıcı', text, re.IGNORECASE)
-                    if match:
-                        large_project_size = f"~{match.group(1)} kullanıcı"
-            
-            # Referans sayısı
-            references_count = "0"
-            for div in card.select('div'):
-                text = self._extract_text(div)
-                if 'Referans' in text:
-                    match = re.search(r'(\d+)\s*Referans', text)
-                    if match:
-                        references_count = match.group(1)
-                    break
+            for node in card.traverse():
+                if node.tag == 'small':
+                    text = self._extract_text(node)
+                    # Küçük harfe bir kez çevrilir ('Ortalama Proje' / 'Büyük Proje' de bu kontrollere dahil)
+                    lowered = text.lower()
+                    if 'ortalama' in lowered:
+                        # Kullanıcı sayısını çıkar
+                        match = AVG_USERS_RE.search(text)
+                        if match:
+                            average_project_size = f"{match.group(1)} kullanıcı"
+                    elif 'büyük' in lowered:
+                        match = BIG_USERS_RE.search(text)
+                        if match:
+                            large_project_size = f"~{match.group(1)} kullanıcı"
+                
+                elif node.tag == 'div' and (references_count is None or certified_experts_count is None):
+                    text = self._extract_text(node)
+                    # Sayıyı içeren ilk div esas alınır
+                    if references_count is None and 'Referans' in text:
+                        match = REF_RE.search(text)
+                        references_count = match.group(1) if match else "0"
+                    if certified_experts_count is None and 'Sertifikalı Uzman' in text:
+                        match = EXP_RE.search(text)
+                        certified_experts_count = match.group(1) if match else "0"
             
-            # Sertifikalı uzman sayısı
-            certified_experts_count = "0"
-            for div in card.select('div'):
-                text = self._extract_text(div)
-                if 'Sertifikalı Uzman' in text:
-                    match = re.search(r'(\d+)\s*Sertifikalı', text)
-                    if match:
-                        certified_experts_count = match.group(1)
-                    break
+            references_count = references_count or "0"
+            certified_experts_count = certified_experts_count or "0"
             
             return Partner(
                 name=name,
@@ -211,58 +365,43 @@ class OdooPartnerScraper:
             )
             
         except Exception as e:
-            print(f"⚠️ Partner parse hatası: {e}")
+            logger.warning("⚠️ Partner parse hatası: %s", e)
             return None
     
-    def _get_total_pages(self, soup: BeautifulSoup) -> int:
+    def _get_total_pages(self, content: bytes) -> int:
         """Toplam sayfa sayısını bulur"""
-        try:
-            # Pagination linklerini bul
-            pagination = soup.select('.pagination .page-link')
-            max_page = 1
-            
-            for link in pagination:
-                href = link.get('href', '')
-                # /page/X formatını ara
-                match = re.search(r'/page/(\d+)', href)
-                if match:
-                    page_num = int(match.group(1))
-                    max_page = max(max_page, page_num)
-            
-            return max_page
-        except Exception:
-            return 1
+        # Tek gereken en büyük /page/X olduğu için HTML ağacı kurmadan ham içerik taranır
+        return max((int(page_num) for page_num in PAGE_RE_BYTES.findall(content)), default=1)
             
     def _scrape_partner_details(self, partner: Partner):
         """Partner'ın detay sayfasına gidip ek verilerini doldurur"""
         if not partner.profile_url:
             return
             
-        time.sleep(self.delay_seconds) # Respectful delay
-        soup = self._get_page(partner.profile_url)
-        if not soup:
+        tree = self._get_page(partner.profile_url)
+        if not tree:
             return
             
         try:
             # 1. Sertifika Detayları
-            cert_div = soup.select_one('.stat_cert')
+            cert_div = tree.css_first('.stat_cert')
             if cert_div:
-                for br in cert_div.find_all('br'):
+                for br in cert_div.css('br'):
                     # Each line is like: <span>2</span> <span class="text-muted">Sertifikalı19</span><br/>
-                    prev_spans = br.find_previous_siblings('span', limit=2)
+                    prev_spans = self._previous_siblings(br, 'span', limit=2)
                     if len(prev_spans) == 2:
-                        count = self._extract_text(prev_spans[1]) # The number span is actually before the text span in DOM order? No, sibling order is reverse when using find_previous_siblings!
+                        count = self._extract_text(prev_spans[1])
                         # The order is: count_span, text_span, br
-                        # previous_siblings returns [text_span, count_span]
+                        # _previous_siblings returns [text_span, count_span]
                         text = self._extract_text(prev_spans[0])
                         if count.isdigit() and text:
                             partner.certifications_breakdown.append({"version": text.strip(), "count": int(count)})
             
             # 2. Sektör/Müşteri (Industries) Detayları
-            ref_div = soup.select_one('.stat_ref')
+            ref_div = tree.css_first('.stat_ref')
             if ref_div:
-                for br in ref_div.find_all('br'):
-                    prev_spans = br.find_previous_siblings('span', limit=2)
+                for br in ref_div.css('br'):
+                    prev_spans = self._previous_siblings(br, 'span', limit=2)
                     if len(prev_spans) == 2:
                         text = self._extract_text(prev_spans[0])
                         count = self._extract_text(prev_spans[1])
@@ -272,56 +411,64 @@ class OdooPartnerScraper:
             # 3. Hakkımızda (About us)
             # Genellikle id="partner_name" divinin hemen altındaki .mb-5 veya içindeki paragraflardır.
             # Odoo 16/17'de genellikle col-lg-9 col-md-8 içinde bulunur.
-            header = soup.select_one('#partner_name')
+            header = tree.css_first('#partner_name')
             if header and header.parent and header.parent.parent:
-                main_div = header.parent.parent.find_next_sibling('div', class_='mb-5')
+                main_div = self._next_sibling(header.parent.parent, 'div', 'mb-5')
                 if main_div:
                     # Temiz metin halinde al
-                    about = main_div.get_text(separator=' ', strip=True)
+                    about = main_div.text(separator=' ', strip=True)
                     # Çok uzun boşlukları tek boşluğa indir
-                    import re
-                    about = re.sub(r'\s+', ' ', about)
+                    about = WHITESPACE_RE.sub(' ', about)
                     if about:
                         partner.about_text = about
                         
         except Exception as e:
-            print(f"⚠️ Detay sayfası parse hatası ({partner.name}): {e}")
+            logger.warning("⚠️ Detay sayfası parse hatası (%s): %s", partner.name, e)
     
-    def scrape_all_partners(self) -> List[Partner]:
-        """Tüm partnerleri çeker"""
-        partners = []
-        
+    def scrape_all_partners(self) -> Iterator[Partner]:
+        """Tüm partnerleri çeker; her partner detayları doldurulur doldurulmaz döndürülür"""
         # İlk sayfayı çek
-        soup = self._get_page(self.PARTNERS_URL)
-        if not soup:
-            print("❌ Ana sayfa çekilemedi!")
-            return partners
+        content = self._get_raw(self.PARTNERS_URL)
+        if not content:
+            logger.error("❌ Ana sayfa çekilemedi!")
+            return
         
         # Toplam sayfa sayısını bul
-        total_pages = self._get_total_pages(soup)
-        print(f"📊 Toplam {total_pages} sayfa bulundu")
+        total_pages = self._get_total_pages(content)
+        logger.info("📊 Toplam %d sayfa bulundu", total_pages)
+        tree = LexborHTMLParser(content)
+        
+        # Kalan sayfaları eşzamanlı çek (indirme ve parse işçi thread'lerinde yapılır)
+        page_urls = [f"{self.PARTNERS_URL}/page/{page_num}" for page_num in range(2, total_pages + 1)]
+        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS) as executor:
+            page_trees = [tree] + list(executor.map(self._get_page, page_urls))
         
+        try:
+            yield from self._iter_page_partners([self.PARTNERS_URL] + page_urls, page_trees)
+        finally:
+            self._save_negative_cache()
+    
+    def _iter_page_partners(self, page_urls: List[str],
+                            page_trees: List[Optional[LexborHTMLParser]]) -> Iterator[Partner]:
+        """Liste sayfalarındaki partner kartlarını sırayla parse eder"""
         # Tüm sayfaları dolaş
-        for page_num in range(1, total_pages + 1):
-            if page_num == 1:
-                page_soup = soup
-            else:
-                time.sleep(self.delay_seconds)
-                page_url = f"{self.PARTNERS_URL}/page/{page_num}"
-                page_soup = self._get_page(page_url)
-                if not page_soup:
-                    continue
+        for page_num, (page_url, page_tree) in enumerate(zip(page_urls, page_trees), start=1):
+            if not page_tree:
+                continue
             
-            # Partner kartlarını bul
-            # Selector: a.text-decoration-none.row
-            partner_cards = page_soup.select('a.text-decoration-none.row.p-2')
+            # Partner kartlarını bul (kart içindeki alanlar _parse_partner_card'da kart kapsamında sorgulanır)
+            partner_cards = page_tree.css(self.CARD_SELECTOR)
             
             if not partner_cards:
                 # Alternatif selector dene
-                partner_cards = page_soup.select('a[href*="/partners/"]')
-                partner_cards = [c for c in partner_cards if 'row' in c.get('class', [])]
+                partner_cards = page_tree.css('a[href*="/partners/"]')
+                partner_cards = [c for c in partner_cards if self._matches(c, class_='row')]
+            
+            logger.info("📄 Sayfa %d: %d partner bulundu", page_num, len(partner_cards))
             
-            print(f"📄 Sayfa {page_num}: {len(partner_cards)} partner bulundu")
+            # Ana sayfa hariç, partner içermeyen sayfaları sonraki çalıştırmalarda atla
+            if not partner_cards and page_num > 1:
+                self._negative_cache[page_url] = time.time()
             
             for card in partner_cards:
                 partner = self._parse_partner_card(card)
@@ -329,93 +476,126 @@ class OdooPartnerScraper:
                     # 🔥 NEW: Detay sayfasına giderek derinlemesine veri çekimi
                     self._scrape_partner_details(partner)
                     
-                    partners.append(partner)
-                    print(f"  ✅ {partner.name} ({partner.level})")
+                    logger.debug("  ✅ %s (%s)", partner.name, partner.level)
+                    yield partner
+
+
+class PartnerWriter:
+    """Partnerleri çekildikçe CSV ve JSON dosyalarına akış halinde yazar
+    
+    Kayıtlar önce geçici dosyalara yazılır; mevcut çıktılar ancak en az bir partner
+    yazılıp işlem hatasız tamamlandığında değiştirilir.
+    """
+    
+    def __init__(self, source_url: str, csv_filename: str = "odoo_partners.csv",
+                 json_filename: str = "odoo_partners.json"):
+        self.source_url = source_url
+        self.csv_filename = csv_filename
+        self.json_filename = json_filename
+        self.count = 0
+        self._csv_file = None
+        self._json_file = None
+        self._csv_writer = None
+    
+    def __enter__(self) -> "PartnerWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+    
+    def _open(self):
+        """Geçici çıktı dosyalarını açar, CSV başlığını ve JSON girişini yazar"""
+        self._csv_file = open(self.csv_filename + ".tmp", 'w', newline='', encoding='utf-8')
+        self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=[f.name for f in fields(Partner)])
+        self._csv_writer.writeheader()
         
-        return partners
+        self._json_file = open(self.json_filename + ".tmp", 'wb')
+        self._json_file.write(b'{\n')
+        self._json_file.write(b'  "scraped_at": ' + orjson.dumps(datetime.now().isoformat()) + b',\n')
+        self._json_file.write(b'  "source_url": ' + orjson.dumps(self.source_url) + b',\n')
+        self._json_file.write(b'  "partners": [\n')
     
-    def save_to_csv(self, partners: List[Partner], filename: str = "odoo_partners.csv"):
-        """Partnerleri CSV dosyasına kaydeder"""
-        if not partners:
-            print("⚠️ Kaydedilecek partner yok!")
-            return
+    def write(self, partner: Partner):
+        """Tek bir partneri her iki dosyaya da ekler"""
+        if self._csv_file is None:
+            self._open()
         
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=asdict(partners[0]).keys())
-            writer.writeheader()
-            for partner in partners:
-                writer.writerow(asdict(partner))
+        row = asdict(partner)
+        self._csv_writer.writerow(row)
         
-        print(f"💾 {len(partners)} partner {filename} dosyasına kaydedildi")
+        # Kayıtlar "partners" dizisi içinde 4 boşluk girintili olacak şekilde yazılır
+        record = orjson.dumps(row, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n    ')
+        if self.count:
+            self._json_file.write(b',\n')
+        self._json_file.write(b'    ' + record)
+        self.count += 1
     
-    def save_to_json(self, partners: List[Partner], filename: str = "odoo_partners.json"):
-        """Partnerleri JSON dosyasına kaydeder"""
-        if not partners:
-            print("⚠️ Kaydedilecek partner yok!")
+    def close(self, commit: bool = True):
+        """Dosyaları kapatır; commit ise geçici dosyaları asıl çıktıların yerine taşır"""
+        if self._csv_file is None:
+            # Hiç partner yazılmadı; mesaj çağırana (main) bırakılır, hata varsa o görünür
             return
         
-        data = {
-            "scraped_at": datetime.now().isoformat(),
-            "total_partners": len(partners),
-            "source_url": self.PARTNERS_URL,
-            "partners": [asdict(p) for p in partners]
-        }
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self._json_file.write(b'\n  ],\n')
+        self._json_file.write(b'  "total_partners": ' + orjson.dumps(self.count) + b'\n')
+        self._json_file.write(b'}')
+        self._csv_file.close()
+        self._json_file.close()
         
-        print(f"💾 {len(partners)} partner {filename} dosyasına kaydedildi")
+        for filename in (self.csv_filename, self.json_filename):
+            if commit:
+                os.replace(filename + ".tmp", filename)
+                logger.info("💾 %d partner %s dosyasına kaydedildi", self.count, filename)
+            else:
+                os.remove(filename + ".tmp")
 
 
 def main():
     """Ana çalıştırma fonksiyonu"""
-    print("=" * 60)
-    print("🚀 Odoo Türkiye Partner Scraper")
-    print("=" * 60)
-    print()
+    # İstek ve kart başına satırlar DEBUG seviyesinde; görmek için level=logging.DEBUG kullanın
+    logging.basicConfig(level=logging.INFO, format="%(message)s",
+                        handlers=[logging.StreamHandler(sys.stdout)], force=True)
     
-    # Scraper'ı başlat
-    scraper = OdooPartnerScraper(delay_seconds=1.5)
-    
-    # Tüm partnerleri çek
-    partners = scraper.scrape_all_partners()
+    logger.info("=" * 60)
+    logger.info("🚀 Odoo Türkiye Partner Scraper")
+    logger.info("=" * 60)
+    logger.info("")
     
-    print()
-    print("-" * 60)
-    print(f"📊 Toplam {len(partners)} partner çekildi")
-    print("-" * 60)
+    # Scraper'ı başlat
+    scraper = OdooPartnerScraper()
     
-    if partners:
-        # CSV olarak kaydet
-        scraper.save_to_csv(partners)
-        
-        # JSON olarak kaydet
-        scraper.save_to_json(partners)
+    # Tüm partnerleri çek ve çekildikçe CSV/JSON dosyalarına yaz
+    levels = Counter()
+    cities = Counter()
+    with PartnerWriter(scraper.PARTNERS_URL) as writer:
+        for p in scraper.scrape_all_partners():
+            writer.write(p)
+            
+            # Özet için yalnızca sayaçlar tutulur, partnerler bellekte biriktirilmez
+            levels[p.level or "Belirtilmemiş"] += 1
+            cities[p.city or "Belirtilmemiş"] += 1
         
-        print()
-        print("✅ İşlem tamamlandı!")
-        print()
+        logger.info("")
+        logger.info("-" * 60)
+        logger.info("📊 Toplam %d partner çekildi", writer.count)
+        logger.info("-" * 60)
+    
+    if writer.count:
+        logger.info("")
+        logger.info("✅ İşlem tamamlandı!")
+        logger.info("")
         
         # Özet göster
-        print("📈 Partner Seviyeleri:")
-        levels = {}
-        for p in partners:
-            level = p.level if p.level else "Belirtilmemiş"
-            levels[level] = levels.get(level, 0) + 1
+        logger.info("📈 Partner Seviyeleri:")
         for level, count in sorted(levels.items()):
-            print(f"   • {level}: {count}")
+            logger.info("   • %s: %d", level, count)
         
-        print()
-        print("🏙️ Şehirlere Göre Dağılım:")
-        cities = {}
-        for p in partners:
-            city = p.city if p.city else "Belirtilmemiş"
-            cities[city] = cities.get(city, 0) + 1
-        sorted_cities = sorted(cities.items(), key=lambda x: x[1], reverse=True)
-        for city, count in sorted_cities[:10]:
-            print(f"   • {city}: {count}")
+        logger.info("")
+        logger.info("🏙️ Şehirlere Göre Dağılım:")
+        for city, count in cities.most_common(10):
+            logger.info("   • %s: %d", city, count)
     else:
-        print("❌ Hiç partner çekilemedi. Lütfen bağlantınızı kontrol edin.")
+        logger.error("❌ Hiç partner çekilemedi. Lütfen bağlantınızı kontrol edin.")
 
 
 if __name__ == "__main__":